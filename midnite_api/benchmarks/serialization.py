@@ -0,0 +1,78 @@
+"""
+Microbenchmark of the per-request parse/serialize cost of `POST /event`.
+
+Compares the previous hot path (Pydantic validation, two `dict()` dumps for
+logging, a set-based `EventResponse` encoded through `jsonable_encoder` and
+`json.dumps`) against the current one (no model dumps for logging, a pre-sorted
+`EventResponse` built without validation and rendered with `orjson`).
+
+Run from the `midnite_api` project directory:
+
+    make bench
+"""
+
+import json
+import timeit
+import warnings
+from typing import Callable, Dict, Set
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from midnite_api.const import AlertCode
+from midnite_api.responses import ORJSONResponse
+from midnite_api.schemas import EventResponse, EventSchema
+
+
+NUMBER = 100_000
+
+REQUEST_BODY = json.dumps(
+    {"type": "withdraw", "amount": "162.00", "user_id": 13, "t": 2}
+).encode()
+
+ALERT_CODES = {AlertCode.CODE_1100, AlertCode.CODE_30, AlertCode.CODE_123}
+
+
+class LegacyEventResponse(BaseModel):
+    alert: bool
+    alert_codes: Set[AlertCode] = set()
+    user_id: int
+
+
+def legacy_request() -> bytes:
+    event = EventSchema.model_validate(json.loads(REQUEST_BODY))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        f"Received event: {event.dict()}"
+        f"Inserting event: {event.dict()} to DB"
+
+    response = LegacyEventResponse(
+        alert=bool(ALERT_CODES), alert_codes=ALERT_CODES, user_id=event.user_id
+    )
+    return json.dumps(jsonable_encoder(response)).encode()
+
+
+def current_request() -> bytes:
+    event = EventSchema.model_validate(json.loads(REQUEST_BODY))
+    (
+        f"Received event: user_id={event.user_id}, type={event.type}, "
+        f"amount={event.amount}, t={event.t}"
+    )
+    f"Inserting event with t={event.t} to DB"
+
+    response = EventResponse.from_alert_codes(ALERT_CODES, event.user_id)
+    return ORJSONResponse(content=response.model_dump()).body
+
+
+def run(benchmarks: Dict[str, Callable[[], bytes]]):
+    assert orjson.loads(legacy_request())["alert_codes"] is not None
+    assert orjson.loads(current_request())["alert_codes"] == sorted(ALERT_CODES)
+
+    for name, func in benchmarks.items():
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=3))
+        print(f"{name:<8} {seconds / NUMBER * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    run({"legacy": legacy_request, "current": current_request})
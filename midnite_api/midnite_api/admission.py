@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Dict
+
+from fastapi import status
+
+from midnite_api.config import (
+    ADMISSION_MAX_CONCURRENCY,
+    ADMISSION_MAX_QUEUE_DEPTH,
+    ADMISSION_QUEUE_TIMEOUT_MS,
+)
+from midnite_api.const import APP_NAME
+
+
+logger = logging.getLogger(APP_NAME)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class AdmissionController:
+    """
+    Bounds the number of requests being processed and waiting to be processed.
+
+    Up to `max_concurrency` requests run at once and up to `max_queue_depth` more
+    wait for a slot for at most `queue_timeout_ms`. Requests beyond that are shed
+    immediately, so that under overload latency stays bounded instead of requests
+    piling up in the threadpool until clients time out.
+
+    Meant to be used from the event loop only, so its counters need no lock.
+    """
+
+    def __init__(
+        self, max_concurrency: int, max_queue_depth: int, queue_timeout_ms: float
+    ):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_queue_depth = max_queue_depth
+        self._queue_timeout = queue_timeout_ms / 1000
+        self._in_flight = 0
+        self._waiting = 0
+        self._admitted = 0
+        self._rejected_queue_full = 0
+        self._rejected_queue_timeout = 0
+
+    async def acquire(self):
+        """
+        Waits for a processing slot, or rejects the request if overloaded.
+
+        Raises:
+            AdmissionRejected:
+                - 429 if the queue of waiting requests is full.
+                - 503 if no slot became available within the queue timeout.
+        """
+        if self._semaphore.locked():
+            if self._waiting >= self._max_queue_depth:
+                self._rejected_queue_full += 1
+                logger.warning(
+                    f"Shedding request: queue full ({self._waiting} waiting)"
+                )
+                raise AdmissionRejected(
+                    status.HTTP_429_TOO_MANY_REQUESTS,
+                    "Too many requests: server is at capacity.",
+                )
+
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(
+                    self._semaphore.acquire(), timeout=self._queue_timeout
+                )
+
+            except TimeoutError:
+                self._rejected_queue_timeout += 1
+                logger.warning("Shedding request: timed out waiting in queue")
+                raise AdmissionRejected(
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "Service unavailable: timed out waiting for capacity.",
+                )
+
+            finally:
+                self._waiting -= 1
+
+        else:
+            await self._semaphore.acquire()
+
+        self._in_flight += 1
+        self._admitted += 1
+
+    def release(self):
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "admitted": self._admitted,
+            "rejected_queue_full": self._rejected_queue_full,
+            "rejected_queue_timeout": self._rejected_queue_timeout,
+        }
+
+
+admission_controller = AdmissionController(
+    ADMISSION_MAX_CONCURRENCY, ADMISSION_MAX_QUEUE_DEPTH, ADMISSION_QUEUE_TIMEOUT_MS
+)
@@ -1,34 +1,29 @@
 import logging
 from typing import Set
 
-from sqlalchemy.orm import Session
-
-from midnite_api.const import AlertCode, APP_NAME, EventType
-from midnite_api.event import (
-    fetch_latest_n_user_deposits,
-    fetch_latest_n_user_events,
-    fetch_sum_user_deposits_min_t,
-)
+from midnite_api.const import AlertCode, APP_NAME, DEPOSIT_WINDOW_SECONDS, EventType
+from midnite_api.models import UserState
 from midnite_api.schemas import EventSchema
 
 
 logger = logging.getLogger(APP_NAME)
 
 
-def generate_alert_codes(db: Session, event: EventSchema) -> Set[AlertCode]:
+def generate_alert_codes(event: EventSchema, state: UserState) -> Set[AlertCode]:
     """
     Generates alert codes for a given financial event.
 
     This function checks the event against a predefined set of rules and returns
-    a set of applicable alert codes. It handles logic for:
+    a set of applicable alert codes. The rules read the user's aggregate state,
+    which must already include the event. It handles logic for:
       - Code 1100: Withdrawal over 100
       - Code 30: 3 consecutive withdrawals
       - Code 300: Last 3 deposits have been increasing over time
       - Code 123: Accumulated deposits' amount is over 200 in a 30-second window
 
     Args:
-        db (Session): SQLAlchemy session used to query historical event data.
         event (EventSchema): The event to analyze for potential alerts.
+        state (UserState): The user's aggregate state, including the event.
 
     Returns:
         Set[AlertCode]: A set of triggered alert codes for the given event.
@@ -40,9 +35,9 @@ def generate_alert_codes(db: Session, event: EventSchema) -> Set[AlertCode]:
     alert_codes = set()
     try:
         add_code_1100(alert_codes, event)
-        add_code_30(alert_codes, event, db)
-        add_code_300(alert_codes, event, db)
-        add_code_123(alert_codes, event, db)
+        add_code_30(alert_codes, event, state)
+        add_code_300(alert_codes, event, state)
+        add_code_123(alert_codes, event, state)
 
     except Exception as e:
         logger.error("Failed to generate alert codes")
@@ -71,20 +66,19 @@ def add_code_1100(alert_codes: Set[AlertCode], event: EventSchema):
         raise e
 
 
-def add_code_30(alert_codes: Set[AlertCode], event: EventSchema, db: Session):
+def add_code_30(alert_codes: Set[AlertCode], event: EventSchema, state: UserState):
     """
     Adds alert code 30 if the user has made 3 consecutive withdraws.
 
     Args:
         alert_codes: The set to which alert codes are added.
         event: The current event (transaction) being processed.
-        db: SQLAlchemy session for querying past events.
+        state: The user's aggregate state, including the current event.
     """
     try:
-        results = fetch_latest_n_user_events(db, event.user_id, 3)
-
-        if len(results) == 3 and all(
-            result.type == EventType.WITHDRAW for result in results
+        event_types = state.last_event_types
+        if len(event_types) == 3 and all(
+            event_type == EventType.WITHDRAW for event_type in event_types
         ):
             logger.info(f"Adding Code: {AlertCode.CODE_30} to alert_codes")
             alert_codes.add(AlertCode.CODE_30)
@@ -94,20 +88,18 @@ def add_code_30(alert_codes: Set[AlertCode], event: EventSchema, db: Session):
         raise e
 
 
-def add_code_300(alert_codes: Set[AlertCode], event: EventSchema, db: Session):
+def add_code_300(alert_codes: Set[AlertCode], event: EventSchema, state: UserState):
     """
     Adds alert code 300 if the user's last 3 deposits have been increasing.
 
     Args:
         alert_codes: The set to which alert codes are added.
         event: The current event (transaction) being processed.
-        db: SQLAlchemy session for querying past events.
+        state: The user's aggregate state, including the current event.
     """
     try:
-        results = fetch_latest_n_user_deposits(db, event.user_id, 3)
-        if len(results) == 3 and all(
-            results[i].amount > results[i + 1].amount for i in range(2)
-        ):
+        amounts = state.last_deposit_amounts
+        if len(amounts) == 3 and all(amounts[i] > amounts[i + 1] for i in range(2)):
             logger.info(f"Adding Code: {AlertCode.CODE_300} to alert_codes")
             alert_codes.add(AlertCode.CODE_300)
 
@@ -116,19 +108,21 @@ def add_code_300(alert_codes: Set[AlertCode], event: EventSchema, db: Session):
         raise e
 
 
-def add_code_123(alert_codes: Set[AlertCode], event: EventSchema, db: Session):
+def add_code_123(alert_codes: Set[AlertCode], event: EventSchema, state: UserState):
     """
     Adds alert code 123 if the user's deposit total in the last 30s is over 200.
 
     Args:
         alert_codes: The set to which alert codes are added.
         event: The current event (transaction) being processed.
-        db: SQLAlchemy session for querying past events.
+        state: The user's aggregate state, including the current event.
     """
     try:
-        min_t = event.t - 30
-        deposit_sum = fetch_sum_user_deposits_min_t(db, event.user_id, min_t)
-        if deposit_sum and deposit_sum >= 200.0:
+        min_t = event.t - DEPOSIT_WINDOW_SECONDS
+        deposit_sum = round(
+            sum(amount for t, amount in state.deposit_window if t >= min_t), 2
+        )
+        if deposit_sum >= 200.0:
             logger.info(f"Adding Code: {AlertCode.CODE_123} to alert_codes")
             alert_codes.add(AlertCode.CODE_123)
 
@@ -0,0 +1,29 @@
+import os
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Profiling of slow requests (see `midnite_api.profiler`)
+PROFILING_ENABLED = _env_bool("MIDNITE_PROFILING_ENABLED", False)  # all requests
+PROFILING_HEADER = "X-Profile"  # opts a single request into profiling
+# Off by default, as it lets any client make the server profile its request
+PROFILING_HEADER_ENABLED = _env_bool("MIDNITE_PROFILING_HEADER_ENABLED", False)
+PROFILING_THRESHOLD_MS = float(os.environ.get("MIDNITE_PROFILING_THRESHOLD_MS", 100))
+PROFILING_DIR = os.environ.get("MIDNITE_PROFILING_DIR", "./profiles")
+PROFILING_MAX_FILES = int(os.environ.get("MIDNITE_PROFILING_MAX_FILES", 100))
+PROFILING_TOP_N = int(os.environ.get("MIDNITE_PROFILING_TOP_N", 50))
+
+# Admission control of `POST /event` (see `midnite_api.admission`)
+ADMISSION_MAX_CONCURRENCY = int(os.environ.get("MIDNITE_ADMISSION_MAX_CONCURRENCY", 32))
+ADMISSION_MAX_QUEUE_DEPTH = int(os.environ.get("MIDNITE_ADMISSION_MAX_QUEUE_DEPTH", 64))
+ADMISSION_QUEUE_TIMEOUT_MS = float(
+    os.environ.get("MIDNITE_ADMISSION_QUEUE_TIMEOUT_MS", 500)
+)
+ADMISSION_RETRY_AFTER_SECONDS = int(
+    os.environ.get("MIDNITE_ADMISSION_RETRY_AFTER_SECONDS", 1)
+)
@@ -3,6 +3,9 @@ from enum import IntEnum, StrEnum
 
 APP_NAME = "midnite_api"
 
+USER_STATE_HISTORY_SIZE = 3  # events/deposits kept per user in tUserState
+DEPOSIT_WINDOW_SECONDS = 30  # deposit window tracked per user in tUserState
+
 
 class AlertCode(IntEnum):
     CODE_30 = 30  # 3 consecutive withdraws
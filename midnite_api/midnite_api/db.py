@@ -7,7 +7,11 @@ DATABASE_URL = "sqlite:///./app.db"
 engine = create_engine(
     DATABASE_URL, connect_args={"check_same_thread": False}
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay loaded after commit, so a request can keep reading what it just
+# wrote (e.g. the user state evaluated by the alert rules) without a new SELECT.
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 Base = declarative_base()
 
@@ -0,0 +1,311 @@
+"""
+Bulk import of historical events, bypassing the HTTP layer.
+
+Usage (from the `midnite_api` project directory, with the API stopped, and
+restarted afterwards so that it picks up the latest imported `t`):
+
+    poetry run python -m midnite_api.importer events.ndjson [more.csv ...]
+
+Supported formats, picked by file extension, are NDJSON (`.ndjson`, `.jsonl`),
+CSV (`.csv`) with a header row, and Parquet (`.parquet`, requires `pyarrow`).
+Every row must have `type`, `amount`, `user_id` and `t` fields, and `t` must be
+strictly increasing across all files and greater than any `t` already stored.
+"""
+
+import argparse
+import csv
+import importlib.util
+from itertools import islice
+import logging
+import logging.config
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from midnite_api.const import APP_NAME
+from midnite_api.db import Base, engine as default_engine
+from midnite_api.logger import LOGGING_CONFIG
+from midnite_api.models import Event, UserState
+from midnite_api.schemas import EventSchema
+from midnite_api.user_state import apply_event
+
+
+logger = logging.getLogger(APP_NAME)
+
+CHUNK_SIZE = 100_000  # rows committed per transaction
+
+
+class EventImportError(ValueError):
+    pass
+
+
+def read_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "rb") as f:
+        for line_num, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                raise EventImportError(f"Invalid JSON in {path}, line {line_num}: {e}")
+
+
+def read_csv(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        try:
+            yield from reader
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise EventImportError(
+                f"Invalid CSV in {path}, line {reader.line_num}: {e}"
+            )
+
+
+def read_parquet(path: str) -> Iterator[Dict[str, Any]]:
+    import pyarrow
+    import pyarrow.parquet as pq
+
+    try:
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=CHUNK_SIZE):
+            yield from batch.to_pylist()
+    except pyarrow.ArrowException as e:
+        raise EventImportError(f"Invalid Parquet file {path}: {e}")
+
+
+READERS = {
+    ".ndjson": read_ndjson,
+    ".jsonl": read_ndjson,
+    ".csv": read_csv,
+    ".parquet": read_parquet,
+}
+
+
+def check_paths(paths: List[str]):
+    """
+    Checks that all files can be imported before the database is touched.
+
+    Args:
+        paths (List[str]): The files to import.
+
+    Raises:
+        EventImportError: If a file does not exist, its extension is not supported,
+            or it is a Parquet file and `pyarrow` is not installed.
+    """
+    for path in paths:
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in READERS:
+            raise EventImportError(f"Unsupported file format: {path}")
+
+        if not os.path.isfile(path):
+            raise EventImportError(f"File not found: {path}")
+
+        if extension == ".parquet" and importlib.util.find_spec("pyarrow") is None:
+            raise EventImportError(f"Importing {path} requires `pyarrow`")
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the rows of an event file, using the reader matching its extension.
+
+    Args:
+        path (str): Path to an NDJSON, CSV or Parquet file, checked by `check_paths`.
+
+    Raises:
+        EventImportError: If the file cannot be read or decoded.
+    """
+    reader = READERS[os.path.splitext(path)[1].lower()]
+    try:
+        yield from reader(path)
+    except OSError as e:
+        raise EventImportError(f"Failed to read {path}: {e}")
+
+
+def validate_rows(
+    rows: Iterable[Dict[str, Any]], path: str, latest_t: Optional[int]
+) -> Iterator[EventSchema]:
+    """
+    Validates rows into events, checking that `t` is strictly increasing.
+
+    Args:
+        rows (Iterable[Dict[str, Any]]): The raw rows to validate.
+        path (str): The file the rows come from, for error messages.
+        latest_t (Optional[int]): The latest `t` already stored, if any.
+
+    Raises:
+        EventImportError: If a row is invalid or its `t` is not strictly increasing.
+    """
+    for i, row in enumerate(rows, start=1):
+        try:
+            event = EventSchema.model_validate(row)
+        except ValidationError as e:
+            raise EventImportError(f"Invalid event in {path}, row {i}: {e}")
+
+        if latest_t is not None and event.t <= latest_t:
+            raise EventImportError(
+                f"Invalid event time t={event.t} in {path}, row {i}: must be "
+                f"strictly greater than last t={latest_t}"
+            )
+
+        latest_t = event.t
+        yield event
+
+
+def _load_user_states(conn: Connection) -> Dict[int, SimpleNamespace]:
+    # Plain namespaces rather than `UserState` instances, as ORM attribute
+    # instrumentation would dominate the cost of folding millions of events.
+    return {
+        row.user_id: SimpleNamespace(**row._asdict())
+        for row in conn.execute(UserState.__table__.select())
+    }
+
+
+def _rebuild_user_states(conn: Connection) -> Dict[int, SimpleNamespace]:
+    """
+    Rebuilds `tUserState` from all events already stored in `tEvent`.
+
+    Needed for databases created before `tUserState` existed, whose events would
+    otherwise be missing from the states of the users the import touches.
+    """
+    logger.info("Rebuilding user states from stored events...")
+    states: Dict[int, SimpleNamespace] = {}
+    events = conn.execution_options(yield_per=CHUNK_SIZE).execute(
+        select(Event.__table__).order_by(Event.t)
+    )
+    for row in events:
+        # `Row.t` is SQLAlchemy's typed-tuple accessor, not the `t` column
+        event = SimpleNamespace(**row._asdict())
+        state = states.get(event.user_id)
+        if state is None:
+            state = states[event.user_id] = _new_user_state(event.user_id)
+        apply_event(state, event)
+
+    _write_user_states(conn, list(states.values()))
+    conn.commit()
+    logger.info(f"Rebuilt state for {len(states)} users")
+
+    return states
+
+
+def _write_user_states(conn: Connection, states: List[SimpleNamespace]):
+    for i in range(0, len(states), CHUNK_SIZE):
+        conn.execute(
+            insert(UserState.__table__).prefix_with("OR REPLACE"),
+            [vars(state) for state in states[i : i + CHUNK_SIZE]],
+        )
+
+
+def _new_user_state(user_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        user_id=user_id,
+        latest_t=None,
+        last_event_types=[],
+        last_deposit_amounts=[],
+        deposit_window=[],
+    )
+
+
+def _insert_chunk(
+    conn: Connection, events: List[EventSchema], states: Dict[int, SimpleNamespace]
+):
+    conn.execute(
+        insert(Event.__table__),
+        [dict(type=e.type, amount=e.amount, user_id=e.user_id, t=e.t) for e in events],
+    )
+
+    touched_user_ids = set()
+    for event in events:
+        state = states.get(event.user_id)
+        if state is None:
+            state = states[event.user_id] = _new_user_state(event.user_id)
+        apply_event(state, event)
+        touched_user_ids.add(event.user_id)
+
+    _write_user_states(conn, [states[user_id] for user_id in touched_user_ids])
+
+
+def import_events(paths: List[str], engine: Engine = default_engine) -> int:
+    """
+    Bulk imports events from files into `tEvent`, updating `tUserState`.
+
+    Rows are streamed and inserted with `executemany` in transactions of
+    `CHUNK_SIZE` rows, each also upserting the state of the users it touches, so
+    events and derived state stay consistent even if the import fails midway.
+    Databases holding events but no user states (created before `tUserState`
+    existed) get their user states rebuilt first. SQLite's `synchronous` mode is
+    turned off for the importing connection. The unique index on `tEvent.t` is
+    kept up to date row by row, as it is what enforces that `t` is unique.
+
+    The API should be stopped while importing, as its cache of the latest `t`
+    would otherwise accept events older than the imported ones. Once restarted,
+    its startup reads the latest imported `t` from `tEvent`.
+
+    Args:
+        paths (List[str]): The NDJSON, CSV or Parquet files to import, in order.
+        engine (Engine): SQLAlchemy engine of the target database.
+
+    Returns:
+        int: The number of imported events.
+
+    Raises:
+        EventImportError: If a file or row is invalid. Files are checked before
+            the database is modified, but chunks committed before an invalid row
+            are kept.
+        SQLAlchemyError: If a database transaction fails.
+    """
+    check_paths(paths)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("PRAGMA synchronous = OFF"))
+        conn.commit()
+
+        latest_t = conn.execute(
+            text('SELECT MAX(t) FROM "tEvent"')
+        ).scalar_one_or_none()
+        has_states = conn.execute(select(UserState.user_id).limit(1)).first()
+        if latest_t is not None and has_states is None:
+            states = _rebuild_user_states(conn)
+        else:
+            states = _load_user_states(conn)
+
+        n_events = 0
+        start = time.perf_counter()
+        for path in paths:
+            logger.info(f"Importing events from {path}")
+            events = validate_rows(read_rows(path), path, latest_t)
+            while chunk := list(islice(events, CHUNK_SIZE)):
+                _insert_chunk(conn, chunk, states)
+                conn.commit()
+
+                latest_t = chunk[-1].t
+                n_events += len(chunk)
+                logger.info(
+                    f"Imported {n_events} events "
+                    f"({n_events / (time.perf_counter() - start):.0f} events/s)"
+                )
+
+    logger.info(f"Imported {n_events} events, latest t={latest_t}")
+    return n_events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="NDJSON, CSV or Parquet files")
+    args = parser.parse_args()
+
+    logging.config.dictConfig(LOGGING_CONFIG)
+    try:
+        import_events(args.paths)
+    except EventImportError as e:
+        logger.error(f"Import failed: {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,14 @@ from midnite_api.cache import cache
 from midnite_api.const import APP_NAME
 from midnite_api.db import Base, engine, SessionLocal
 from midnite_api.logger import LOGGING_CONFIG
-from midnite_api.middleware import RequestIDMiddleware
-from midnite_api.models import Event
+from midnite_api.middleware import (
+    AdmissionControlMiddleware,
+    ProfilingMiddleware,
+    RequestIDMiddleware,
+)
+from midnite_api.models import Event, UserState
 from midnite_api.router import router
+from midnite_api.user_state import rebuild_user_states
 
 
 logging.config.dictConfig(LOGGING_CONFIG)
@@ -25,7 +30,9 @@ async def lifespan(app: FastAPI):
 
     This function is called on application startup and shutdown. On startup,
     it initializes the database schema (creates tables) and sets up the in-memory
-    cache with the latest event timestamp (`t`) if any events exist.
+    cache with the latest event timestamp (`t`) if any events exist. Databases
+    holding events but no user states (created before `tUserState` existed) get
+    their user states rebuilt from `tEvent`.
 
     Args:
         app (FastAPI): The FastAPI application instance.
@@ -39,6 +46,9 @@ async def lifespan(app: FastAPI):
         if latest_t is not None:
             cache.initialize(latest_t)
             logger.info(f"Initialized cache with t={latest_t}")
+
+            if db.query(UserState.user_id).limit(1).scalar() is None:
+                rebuild_user_states(db)
         else:
             logger.info("No events found. Cache starts empty.")
 
@@ -55,4 +65,6 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(lifespan=lifespan)
 app.include_router(router)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(AdmissionControlMiddleware)
 app.add_middleware(RequestIDMiddleware)
@@ -1,9 +1,23 @@
+import time
 import uuid
 
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from midnite_api.context import request_id_ctx_var
+from midnite_api.admission import AdmissionRejected, admission_controller
+from midnite_api.config import (
+    ADMISSION_RETRY_AFTER_SECONDS,
+    PROFILING_ENABLED,
+    PROFILING_HEADER,
+    PROFILING_HEADER_ENABLED,
+    PROFILING_THRESHOLD_MS,
+)
+from midnite_api.context import get_request_id, request_id_ctx_var
+from midnite_api.profiler import RequestProfile, profile_ctx_var, write_profile
+from midnite_api.responses import ORJSONResponse
 
 
 class RequestIDMiddleware(BaseHTTPMiddleware):
@@ -11,3 +25,86 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
         request_id = str(uuid.uuid4())
         request_id_ctx_var.set(request_id)
         return await call_next(request)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests when enabled globally or, if `PROFILING_HEADER_ENABLED`, via
+    the `X-Profile: 1` header, and saves the profile of those slower than
+    `PROFILING_THRESHOLD_MS`, including requests that fail.
+
+    Written as a plain ASGI middleware so that requests which are not profiled
+    pass straight through. Must run inside `RequestIDMiddleware` so profiles
+    carry the request ID.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not (
+            PROFILING_ENABLED
+            or (
+                PROFILING_HEADER_ENABLED
+                and Headers(scope=scope).get(PROFILING_HEADER) == "1"
+            )
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(
+            request_id=get_request_id(),
+            method=scope["method"],
+            path=scope["path"],
+        )
+        token = profile_ctx_var.set(profile)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+
+        finally:
+            profile.duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            profile_ctx_var.reset(token)
+            if profile.duration_ms >= PROFILING_THRESHOLD_MS:
+                await run_in_threadpool(write_profile, profile)
+
+
+class AdmissionControlMiddleware:
+    """
+    Sheds `POST /event` requests with a 429/503 and a `Retry-After` header when
+    `admission_controller` has no capacity left.
+
+    Written as a plain ASGI middleware to keep its own overhead off the ingestion
+    path it protects.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] != "/event"
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await admission_controller.acquire()
+
+        except AdmissionRejected as e:
+            response = ORJSONResponse(
+                content={"detail": e.detail},
+                status_code=e.status_code,
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+
+        finally:
+            admission_controller.release()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Enum, Integer, Numeric
+from sqlalchemy import JSON, Column, Enum, Integer, Numeric
 
 from midnite_api.const import EventType
 from midnite_api.db import Base
@@ -6,8 +6,17 @@ from midnite_api.db import Base
 
 class Event(Base):
     __tablename__ = "tEvent"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=False)
     amount = Column(Numeric(10, 2), nullable=False)
     t = Column(Integer, unique=True, nullable=False)
     type = Column(Enum(EventType), nullable=False)
+
+
+class UserState(Base):
+    __tablename__ = "tUserState"
+    user_id = Column(Integer, primary_key=True)
+    latest_t = Column(Integer, nullable=False)
+    last_event_types = Column(JSON, nullable=False)  # newest first
+    last_deposit_amounts = Column(JSON, nullable=False)  # newest first
+    deposit_window = Column(JSON, nullable=False)  # [t, amount] pairs, oldest first
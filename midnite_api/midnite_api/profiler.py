@@ -0,0 +1,136 @@
+import cProfile
+from contextlib import suppress
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+import io
+import logging
+import os
+import pstats
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from midnite_api.config import PROFILING_DIR, PROFILING_MAX_FILES, PROFILING_TOP_N
+from midnite_api.const import APP_NAME
+
+
+logger = logging.getLogger(APP_NAME)
+
+
+@dataclass
+class RequestProfile:
+    """
+    Profiling data collected while handling a single request.
+
+    The instance is shared by reference through `profile_ctx_var`, so data
+    gathered in the threadpool running the endpoint is visible to the middleware
+    that decides whether to keep it.
+    """
+
+    request_id: str
+    method: str
+    path: str
+    sql_statements: List[Dict[str, Any]] = field(default_factory=list)
+    stats: Optional[str] = None
+    duration_ms: Optional[float] = None
+
+
+profile_ctx_var: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "profile", default=None
+)
+
+
+def get_profile() -> Optional[RequestProfile]:
+    return profile_ctx_var.get()
+
+
+def profiled(func: Callable) -> Callable:
+    """
+    Decorator running an endpoint under `cProfile` when its request is profiled.
+
+    Up to Python 3.11, `cProfile` only sees the thread it is enabled in, so it has
+    to wrap the endpoint itself rather than the middleware, as sync endpoints run
+    in the threadpool. From Python 3.12 on it is built on the process-wide
+    `sys.monitoring`, so a profile also includes calls made by requests handled
+    concurrently in other threads. Requests that are not profiled call the
+    endpoint directly.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = get_profile()
+        if profile is None:
+            return func(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active (e.g. a concurrent profiled
+            # request on Python 3.12+), so only SQL statements are captured.
+            return func(*args, **kwargs)
+
+        try:
+            return func(*args, **kwargs)
+
+        finally:
+            profiler.disable()
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILING_TOP_N)
+            profile.stats = stream.getvalue()
+
+    return wrapper
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if get_profile() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = get_profile()
+    if profile is None or not conn.info.get("profile_query_start"):
+        return
+
+    duration = time.perf_counter() - conn.info["profile_query_start"].pop()
+    profile.sql_statements.append(
+        {"statement": statement, "duration_ms": round(duration * 1000, 3)}
+    )
+
+
+def write_profile(profile: RequestProfile):
+    """
+    Writes a request profile to the on-disk ring buffer.
+
+    Profiles are stored as one JSON file per request in `PROFILING_DIR`, named so
+    that they sort chronologically. Once more than `PROFILING_MAX_FILES` profiles
+    exist, the oldest ones are removed.
+
+    Args:
+        profile (RequestProfile): The profile of a slow request.
+    """
+    try:
+        os.makedirs(PROFILING_DIR, exist_ok=True)
+        file_name = f"{time.time_ns()}-{profile.request_id}.json"
+        with open(os.path.join(PROFILING_DIR, file_name), "wb") as f:
+            f.write(orjson.dumps(profile, option=orjson.OPT_INDENT_2))
+
+        file_names = sorted(
+            name for name in os.listdir(PROFILING_DIR) if name.endswith(".json")
+        )
+        for name in file_names[:-PROFILING_MAX_FILES]:
+            # Concurrent writers may already have removed the same file
+            with suppress(FileNotFoundError):
+                os.remove(os.path.join(PROFILING_DIR, name))
+
+        logger.info(f"Saved profile of slow request to {file_name}")
+
+    except OSError as e:
+        logger.error(f"Failed to write request profile: {e}")
@@ -0,0 +1,17 @@
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with `orjson` instead of the standard library encoder.
+
+    `orjson` natively serializes enums, dataclasses and datetimes and is
+    considerably faster than `json.dumps` on the small payloads returned by
+    this service.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
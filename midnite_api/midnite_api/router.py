@@ -1,15 +1,19 @@
 import logging
-from typing import Annotated
+from typing import Annotated, Dict
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from midnite_api.admission import admission_controller
 from midnite_api.alerts import generate_alert_codes
 from midnite_api.cache import cache
 from midnite_api.const import APP_NAME
 from midnite_api.db import get_db
 from midnite_api.event import insert_event
+from midnite_api.profiler import profiled
+from midnite_api.responses import ORJSONResponse
 from midnite_api.schemas import EventResponse, EventSchema
+from midnite_api.user_state import OutOfOrderEventError
 
 
 logger = logging.getLogger(APP_NAME)
@@ -17,32 +21,44 @@ logger = logging.getLogger(APP_NAME)
 router = APIRouter()
 
 
-@router.post("/event", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/event",
+    status_code=status.HTTP_201_CREATED,
+    response_model=EventResponse,
+    response_class=ORJSONResponse,
+)
+@profiled
 def post_event(
     event: EventSchema,
     db: Annotated[Session, Depends(get_db)],
-) -> EventResponse:
+) -> ORJSONResponse:
     """
     Handles POST request for a new financial event and checks for alert conditions.
 
     Validates that the event's timestamp (`t`) is strictly increasing relative to
     the latest processed event. If valid, stores the event in the database,
-    updates the cache, and evaluates applicable alert codes.
+    updates the cache, and evaluates applicable alert codes. The response is
+    rendered directly with `orjson`, bypassing FastAPI's response model validation
+    since its content is produced internally.
 
     Args:
         event (EventSchema): The incoming financial event payload.
         db (Session): SQLAlchemy database session dependency.
 
     Returns:
-        EventResponse: A response indicating whether any alerts were triggered and
-        which alert codes were matched.
+        ORJSONResponse: An `EventResponse` body indicating whether any alerts were
+        triggered and which alert codes were matched.
 
     Raises:
         HTTPException:
-            - 400 if the event's `t` is not strictly increasing.
+            - 400 if the event's `t` is not strictly increasing, either relative
+              to the cache or to the user's latest stored event.
             - 500 for any unexpected server error.
     """
-    logger.info(f"Received event: {event.dict()}")
+    logger.info(
+        f"Received event: user_id={event.user_id}, type={event.type}, "
+        f"amount={event.amount}, t={event.t}"
+    )
     try:
         latest_t = cache.get_latest_t()
         if latest_t is not None and event.t <= latest_t:
@@ -54,21 +70,37 @@ def post_event(
                 detail="Invalid event time t: must be strictly increasing.",
             )
 
-        insert_event(db, event)
+        state = insert_event(db, event)
         cache.update_latest_t(event.t)
 
-        alert = False
-        alert_codes = generate_alert_codes(db, event)
-        if alert_codes:
-            alert = True
+        alert_codes = generate_alert_codes(event, state)
+        response = EventResponse.from_alert_codes(alert_codes, event.user_id)
 
-        return EventResponse(
-            alert=alert, alert_codes=alert_codes, user_id=event.user_id
+        return ORJSONResponse(
+            content=response.model_dump(), status_code=status.HTTP_201_CREATED
         )
 
     except HTTPException as e:
         raise e
 
+    except OutOfOrderEventError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid event time t: must be strictly increasing.",
+        )
+
     except Exception as e:
         logger.error(f"Unexpected error processing event: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/metrics/admission")
+async def get_admission_metrics() -> Dict[str, int]:
+    """
+    Returns the admission control counters of `POST /event`.
+
+    Reports the requests currently in flight and waiting, and the totals of
+    admitted requests and of requests shed because the queue was full or
+    because they timed out waiting in it.
+    """
+    return admission_controller.get_metrics()
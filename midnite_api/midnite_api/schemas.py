@@ -1,4 +1,4 @@
-from typing import Set
+from typing import List, Set
 
 from pydantic import BaseModel
 
@@ -17,5 +17,26 @@ class EventSchema(BaseModel):
 
 class EventResponse(BaseModel):
     alert: bool
-    alert_codes: Set[AlertCode] = set()
+    alert_codes: List[AlertCode] = []
     user_id: int
+
+    @classmethod
+    def from_alert_codes(
+        cls, alert_codes: Set[AlertCode], user_id: int
+    ) -> "EventResponse":
+        """
+        Builds a response from a set of generated alert codes.
+
+        The codes are sorted once here so that serialization is a plain list dump,
+        and validation is skipped since the values are produced internally.
+
+        Args:
+            alert_codes (Set[AlertCode]): The alert codes triggered by the event.
+            user_id (int): The ID of the user the event belongs to.
+
+        Returns:
+            EventResponse: The response with `alert_codes` as a sorted list.
+        """
+        return cls.model_construct(
+            alert=bool(alert_codes), alert_codes=sorted(alert_codes), user_id=user_id
+        )
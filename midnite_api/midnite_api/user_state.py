@@ -0,0 +1,128 @@
+import logging
+from typing import Dict, Optional, Union
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from midnite_api.const import (
+    APP_NAME,
+    DEPOSIT_WINDOW_SECONDS,
+    USER_STATE_HISTORY_SIZE,
+    EventType,
+)
+from midnite_api.models import Event, UserState
+from midnite_api.schemas import EventSchema
+
+
+logger = logging.getLogger(APP_NAME)
+
+
+class OutOfOrderEventError(ValueError):
+    pass
+
+
+def apply_event(
+    state: Optional[UserState], event: Union[Event, EventSchema]
+) -> UserState:
+    """
+    Folds an event into a user's aggregate state.
+
+    Creates the state if the user has none yet. The JSON columns are always
+    reassigned (never mutated in place) so that SQLAlchemy detects the change.
+
+    Args:
+        state (Optional[UserState]): The user's current state, if any. Any object
+            with the same attributes is accepted and updated in place.
+        event (Union[Event, EventSchema]): The event to fold into the state. Events
+            must be applied in increasing order of `t`.
+
+    Returns:
+        UserState: The updated (or newly created) state.
+    """
+    if state is None:
+        state = UserState(
+            user_id=event.user_id,
+            last_event_types=[],
+            last_deposit_amounts=[],
+            deposit_window=[],
+        )
+
+    state.latest_t = event.t
+    state.last_event_types = [str(event.type)] + state.last_event_types[
+        : USER_STATE_HISTORY_SIZE - 1
+    ]
+
+    min_t = event.t - DEPOSIT_WINDOW_SECONDS
+    deposit_window = [entry for entry in state.deposit_window if entry[0] >= min_t]
+    if event.type == EventType.DEPOSIT:
+        amount = round(float(event.amount), 2)
+        state.last_deposit_amounts = [amount] + state.last_deposit_amounts[
+            : USER_STATE_HISTORY_SIZE - 1
+        ]
+        deposit_window.append([event.t, amount])
+
+    state.deposit_window = deposit_window
+
+    return state
+
+
+def update_user_state(db: Session, event: EventSchema) -> UserState:
+    """
+    Updates the aggregate state of the event's user without committing.
+
+    Meant to be called from within the transaction that inserts the event, so the
+    event and the derived state are always committed (or rolled back) together.
+    Events older than the user's latest one are rejected, as folding them would
+    put the state out of order.
+
+    Args:
+        db (Session): SQLAlchemy session holding the current transaction.
+        event (EventSchema): The event being inserted.
+
+    Returns:
+        UserState: The updated state of the user.
+
+    Raises:
+        OutOfOrderEventError: If `t` is not greater than the user's latest `t`.
+    """
+    state = db.get(UserState, event.user_id)
+    if state is not None and event.t <= state.latest_t:
+        raise OutOfOrderEventError(
+            f"Event t={event.t} is not after latest t={state.latest_t} "
+            f"of user {event.user_id}"
+        )
+
+    state = apply_event(state, event)
+    db.add(state)
+
+    return state
+
+
+def rebuild_user_states(db: Session):
+    """
+    Rebuilds the `tUserState` table from scratch using all events in `tEvent`.
+
+    Events are streamed in increasing order of `t` and folded in memory, then the
+    resulting states are written in a single transaction.
+
+    Args:
+        db (Session): SQLAlchemy session used to read events and write states.
+
+    Raises:
+        SQLAlchemyError: If the database transaction fails.
+    """
+    try:
+        logger.info("Rebuilding user states from events...")
+        states: Dict[int, UserState] = {}
+        for event in db.query(Event).order_by(Event.t).yield_per(10_000):
+            states[event.user_id] = apply_event(states.get(event.user_id), event)
+
+        db.query(UserState).delete()
+        db.add_all(states.values())
+        db.commit()
+        logger.info(f"Rebuilt state for {len(states)} users")
+
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Database Error while rebuilding user states: {e}")
+        raise e
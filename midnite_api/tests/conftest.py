@@ -1,4 +1,14 @@
-from typing import Any
+from typing import Any, Iterator
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from midnite_api.cache import cache
+from midnite_api.db import Base, get_db
+from midnite_api.main import app
 
 
 def pytest_generate_tests(metafunc: Any) -> None:
@@ -15,3 +25,47 @@ def pytest_generate_tests(metafunc: Any) -> None:
         for i, scenario in enumerate(function_scenarios)
     ]
     metafunc.parametrize(function_params, function_values, ids=ids_list, scope="class")
+
+
+@pytest.fixture
+def engine(tmp_path: Any) -> Engine:
+    """Engine of a fresh SQLite database with all tables created"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'app.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def session_factory(engine: Engine) -> sessionmaker:
+    return sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+    )
+
+
+@pytest.fixture
+def db(session_factory: sessionmaker) -> Iterator[Session]:
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client(session_factory: sessionmaker) -> Iterator[TestClient]:
+    """Test client of the app backed by a fresh SQLite database"""
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    cache.clear()
+    app.dependency_overrides[get_db] = get_test_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    cache.clear()
@@ -0,0 +1,108 @@
+import asyncio
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+from midnite_api.admission import AdmissionController, AdmissionRejected
+
+
+class TestAdmissionController:
+    test_acquire_scenarios = [
+        dict(
+            description="acquire admits requests up to the concurrency limit",
+            max_concurrency=2,
+            max_queue_depth=0,
+            n_requests=2,
+            expected_statuses=[None, None],
+            expected_metrics=dict(admitted=2, rejected_queue_full=0),
+        ),
+        dict(
+            description="acquire sheds requests with 429 when the queue is full",
+            max_concurrency=1,
+            max_queue_depth=0,
+            n_requests=3,
+            expected_statuses=[None, 429, 429],
+            expected_metrics=dict(admitted=1, rejected_queue_full=2),
+        ),
+        dict(
+            description="acquire sheds queued requests with 503 after the timeout",
+            max_concurrency=1,
+            max_queue_depth=1,
+            n_requests=2,
+            expected_statuses=[None, 503],
+            expected_metrics=dict(admitted=1, rejected_queue_timeout=1),
+        ),
+    ]
+
+    def test_acquire(
+        self,
+        max_concurrency: int,
+        max_queue_depth: int,
+        n_requests: int,
+        expected_statuses: List[Optional[int]],
+        expected_metrics: Dict[str, int],
+    ) -> None:
+        async def run():
+            controller = AdmissionController(
+                max_concurrency, max_queue_depth, queue_timeout_ms=10
+            )
+            statuses = []
+            for _ in range(n_requests):
+                try:
+                    await controller.acquire()
+                    statuses.append(None)
+                except AdmissionRejected as e:
+                    statuses.append(e.status_code)
+
+            return statuses, controller.get_metrics()
+
+        statuses, metrics = asyncio.run(run())
+
+        assert statuses == expected_statuses
+        assert expected_metrics.items() <= metrics.items()
+        assert metrics["waiting"] == 0
+
+
+class TestAdmissionControlMiddleware:
+    test_shedding_scenarios = [
+        dict(
+            description="POST /event is shed with 429 when the queue is full",
+            max_queue_depth=0,
+            expected_status_code=429,
+            expected_metrics=dict(rejected_queue_full=1, rejected_queue_timeout=0),
+        ),
+        dict(
+            description="POST /event is shed with 503 after waiting in the queue",
+            max_queue_depth=1,
+            expected_status_code=503,
+            expected_metrics=dict(rejected_queue_full=0, rejected_queue_timeout=1),
+        ),
+    ]
+
+    def test_shedding(
+        self,
+        client,
+        max_queue_depth: int,
+        expected_status_code: int,
+        expected_metrics: Dict[str, int],
+    ) -> None:
+        controller = AdmissionController(
+            max_concurrency=1, max_queue_depth=max_queue_depth, queue_timeout_ms=10
+        )
+        # Take the only slot, as a request still being processed would
+        asyncio.run(controller.acquire())
+
+        with (
+            patch("midnite_api.middleware.admission_controller", controller),
+            patch("midnite_api.router.admission_controller", controller),
+            patch("midnite_api.middleware.ADMISSION_RETRY_AFTER_SECONDS", 3),
+        ):
+            response = client.post(
+                "/event",
+                json={"type": "deposit", "amount": 10.0, "user_id": 1, "t": 1},
+            )
+            metrics_response = client.get("/metrics/admission")
+
+        assert response.status_code == expected_status_code
+        assert response.headers["Retry-After"] == "3"
+        assert metrics_response.status_code == 200
+        assert expected_metrics.items() <= metrics_response.json().items()
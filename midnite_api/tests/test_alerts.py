@@ -1,8 +1,7 @@
-from typing import List, Set
-from unittest.mock import patch
+from typing import Set
 
 from midnite_api.alerts import add_code_1100, add_code_30, add_code_300, add_code_123
-from midnite_api.models import Event
+from midnite_api.models import UserState
 from midnite_api.const import AlertCode, EventType
 from midnite_api.schemas import EventSchema
 
@@ -38,37 +37,38 @@ class TestAlerts:
             description="add_code_30 triggers when 3 last events are withdrawals",
             alert_codes=set(),
             event=EventSchema(user_id=1, amount=100.0, t=4, type=EventType.WITHDRAW),
-            mock_events=[
-                Event(user_id=1, amount=10.0, t=3, type=EventType.WITHDRAW),
-                Event(user_id=1, amount=20.0, t=2, type=EventType.WITHDRAW),
-                Event(user_id=1, amount=30.0, t=1, type=EventType.WITHDRAW),
-            ],
+            state=UserState(
+                user_id=1,
+                latest_t=4,
+                last_event_types=["withdraw", "withdraw", "withdraw"],
+                last_deposit_amounts=[],
+                deposit_window=[],
+            ),
             expected_alert_codes={AlertCode.CODE_30},
         ),
         dict(
             description="add_code_30 does NOT trigger if not all 3 last events are withdrawals",
             alert_codes=set(),
             event=EventSchema(user_id=1, amount=100.0, t=4, type=EventType.WITHDRAW),
-            mock_events=[
-                Event(user_id=1, amount=10.0, t=3, type=EventType.WITHDRAW),
-                Event(user_id=1, amount=20.0, t=2, type=EventType.DEPOSIT),
-                Event(user_id=1, amount=30.0, t=1, type=EventType.WITHDRAW),
-            ],
+            state=UserState(
+                user_id=1,
+                latest_t=4,
+                last_event_types=["withdraw", "deposit", "withdraw"],
+                last_deposit_amounts=[20.0],
+                deposit_window=[[2, 20.0]],
+            ),
             expected_alert_codes=set(),
         ),
     ]
 
-    @patch("midnite_api.alerts.fetch_latest_n_user_events")
     def test_add_code_30(
         self,
-        mock_fetch,
         alert_codes: Set[AlertCode],
         event: EventSchema,
-        mock_events: List[Event],
+        state: UserState,
         expected_alert_codes: Set[AlertCode],
     ) -> None:
-        mock_fetch.return_value = mock_events
-        add_code_30(alert_codes, event, db=None)
+        add_code_30(alert_codes, event, state)
 
         assert alert_codes == expected_alert_codes
 
@@ -77,37 +77,38 @@ class TestAlerts:
             description="add_code_300 triggers alert when last 3 deposits are increasing",
             alert_codes=set(),
             event=EventSchema(user_id=1, amount=40.0, t=4, type=EventType.DEPOSIT),
-            db_return_value=[
-                Event(type=EventType.DEPOSIT, amount=40.0, user_id=1, t=4),
-                Event(type=EventType.DEPOSIT, amount=30.0, user_id=1, t=3),
-                Event(type=EventType.DEPOSIT, amount=20.0, user_id=1, t=2),
-            ],
+            state=UserState(
+                user_id=1,
+                latest_t=4,
+                last_event_types=["deposit", "deposit", "deposit"],
+                last_deposit_amounts=[40.0, 30.0, 20.0],
+                deposit_window=[[2, 20.0], [3, 30.0], [4, 40.0]],
+            ),
             expected_alert_codes={AlertCode.CODE_300},
         ),
         dict(
             description="add_code_300 does not trigger alert when deposits are not strictly increasing",
             alert_codes=set(),
             event=EventSchema(user_id=1, amount=30.0, t=4, type=EventType.DEPOSIT),
-            db_return_value=[
-                Event(type=EventType.DEPOSIT, amount=30.0, user_id=1, t=4),
-                Event(type=EventType.DEPOSIT, amount=40.0, user_id=1, t=3),
-                Event(type=EventType.DEPOSIT, amount=20.0, user_id=1, t=2),
-            ],
+            state=UserState(
+                user_id=1,
+                latest_t=4,
+                last_event_types=["deposit", "deposit", "deposit"],
+                last_deposit_amounts=[30.0, 40.0, 20.0],
+                deposit_window=[[2, 20.0], [3, 40.0], [4, 30.0]],
+            ),
             expected_alert_codes=set(),
         ),
     ]
 
-    @patch("midnite_api.alerts.fetch_latest_n_user_deposits")
     def test_add_code_300(
         self,
-        mock_fetch,
         alert_codes,
         event,
-        db_return_value,
+        state,
         expected_alert_codes,
     ):
-        mock_fetch.return_value = db_return_value
-        add_code_300(alert_codes, event, db=None)
+        add_code_300(alert_codes, event, state)
 
         assert alert_codes == expected_alert_codes
 
@@ -117,27 +118,36 @@ class TestAlerts:
             alert_codes=set(),
             event=EventSchema(user_id=1, amount=150.0, t=32, type=EventType.DEPOSIT),
             expected_alert_codes={AlertCode.CODE_123},
-            mock_sum_return=250.0,
+            state=UserState(
+                user_id=1,
+                latest_t=32,
+                last_event_types=["deposit", "deposit"],
+                last_deposit_amounts=[150.0, 100.0],
+                deposit_window=[[10, 100.0], [32, 150.0]],
+            ),
         ),
         dict(
-            description="add_code_123 does not trigger alert when deposits < 200",
+            description="add_code_123 does not trigger alert when 30s deposits < 200",
             alert_codes=set(),
             event=EventSchema(user_id=1, amount=100.0, t=32, type=EventType.DEPOSIT),
             expected_alert_codes=set(),
-            mock_sum_return=150.0,
+            state=UserState(
+                user_id=1,
+                latest_t=32,
+                last_event_types=["deposit", "deposit"],
+                last_deposit_amounts=[100.0, 150.0],
+                deposit_window=[[1, 150.0], [32, 100.0]],
+            ),
         ),
     ]
 
-    @patch("midnite_api.alerts.fetch_sum_user_deposits_min_t")
     def test_add_code_123(
         self,
-        mock_fetch_sum,
         alert_codes: Set[AlertCode],
         event: EventSchema,
         expected_alert_codes: Set[AlertCode],
-        mock_sum_return: float,
+        state: UserState,
     ) -> None:
-        mock_fetch_sum.return_value = mock_sum_return
-        add_code_123(alert_codes, event, db=None)
+        add_code_123(alert_codes, event, state)
 
         assert alert_codes == expected_alert_codes
@@ -0,0 +1,150 @@
+from typing import List, Optional
+
+import orjson
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from midnite_api.const import EventType
+from midnite_api.db import Base
+from midnite_api.importer import EventImportError, import_events
+from midnite_api.models import Event
+
+NDJSON_EVENTS = (
+    '{"type": "deposit", "amount": "50.00", "user_id": 1, "t": 1}\n'
+    '{"type": "withdraw", "amount": 20.5, "user_id": 2, "t": 2}\n'
+)
+
+CSV_EVENTS = "type,amount,user_id,t\ndeposit,60.00,1,3\ndeposit,70.00,1,4\n"
+
+
+class TestImporter:
+    test_import_events_scenarios = [
+        dict(
+            description="import_events first rebuilds missing states of old events",
+            stored_events=[
+                Event(type=EventType.DEPOSIT, amount=10.0, user_id=1, t=-2),
+                Event(type=EventType.DEPOSIT, amount=20.0, user_id=1, t=-1),
+            ],
+            files={"a.ndjson": NDJSON_EVENTS},
+            expected_error=None,
+            expected_ts=[-2, -1, 1, 2],
+            expected_deposit_amounts=[50.0, 20.0, 10.0],
+        ),
+        dict(
+            description="import_events imports NDJSON and CSV files in order",
+            stored_events=[],
+            files={"a.ndjson": NDJSON_EVENTS, "b.csv": CSV_EVENTS},
+            expected_error=None,
+            expected_ts=[1, 2, 3, 4],
+            expected_deposit_amounts=[70.0, 60.0, 50.0],
+        ),
+        dict(
+            description="import_events rejects events whose t is not increasing",
+            stored_events=[],
+            files={"a.csv": CSV_EVENTS, "b.ndjson": NDJSON_EVENTS},
+            expected_error="Invalid event time t=1",
+            expected_ts=[3, 4],
+            expected_deposit_amounts=[70.0, 60.0],
+        ),
+        dict(
+            description="import_events rejects malformed NDJSON with its file and line",
+            stored_events=[],
+            files={
+                "a.csv": CSV_EVENTS,
+                "b.ndjson": '{"type": "deposit", "amount": 5, "user_id": 1, "t": 5}\n'
+                "not json\n",
+            },
+            expected_error=r"Invalid JSON in .*b\.ndjson, line 2",
+            expected_ts=[3, 4],
+            expected_deposit_amounts=[70.0, 60.0],
+        ),
+        dict(
+            description="import_events rejects unsupported files before using the DB",
+            stored_events=[],
+            files={"a.ndjson": NDJSON_EVENTS, "b.xml": ""},
+            expected_error="Unsupported file format",
+            expected_ts=None,
+            expected_deposit_amounts=None,
+        ),
+        dict(
+            description="import_events rejects missing files before touching the DB",
+            stored_events=[],
+            files={"a.ndjson": NDJSON_EVENTS, "b.csv": None},
+            expected_error=r"File not found: .*b\.csv",
+            expected_ts=None,
+            expected_deposit_amounts=None,
+        ),
+    ]
+
+    def test_import_events(
+        self,
+        tmp_path,
+        stored_events: List[Event],
+        files,
+        expected_error: Optional[str],
+        expected_ts: Optional[List[int]],
+        expected_deposit_amounts: Optional[List[float]],
+    ) -> None:
+        engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        if stored_events:
+            Base.metadata.create_all(bind=engine)
+            with Session(engine) as db:
+                db.add_all(stored_events)
+                db.commit()
+
+        paths = []
+        for name, content in files.items():
+            if content is not None:
+                (tmp_path / name).write_text(content)
+            paths.append(str(tmp_path / name))
+
+        if expected_error:
+            with pytest.raises(EventImportError, match=expected_error):
+                import_events(paths, engine)
+        else:
+            n_events = import_events(paths, engine)
+            assert n_events == len(expected_ts) - len(stored_events)
+
+        with engine.connect() as conn:
+            tables = conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'table'")
+            ).scalars()
+            if expected_ts is None:
+                assert list(tables) == []
+                return
+
+            ts = conn.execute(text('SELECT t FROM "tEvent" ORDER BY t')).scalars()
+            deposit_amounts = conn.execute(
+                text('SELECT last_deposit_amounts FROM "tUserState" WHERE user_id = 1')
+            ).scalar()
+
+            assert list(ts) == expected_ts
+            if expected_deposit_amounts is not None:
+                assert orjson.loads(deposit_amounts) == expected_deposit_amounts
+
+    test_import_parquet_scenarios = [
+        dict(
+            description="import_events imports Parquet files",
+            rows=[
+                {"type": "deposit", "amount": "50.00", "user_id": 1, "t": 1},
+                {"type": "withdraw", "amount": "20.50", "user_id": 2, "t": 2},
+            ],
+            expected_ts=[1, 2],
+        ),
+    ]
+
+    def test_import_parquet(
+        self, tmp_path, rows: List[dict], expected_ts: List[int]
+    ) -> None:
+        pyarrow = pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+
+        path = tmp_path / "a.parquet"
+        pq.write_table(pyarrow.Table.from_pylist(rows), path)
+        engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+
+        assert import_events([str(path)], engine) == len(expected_ts)
+        with engine.connect() as conn:
+            ts = conn.execute(text('SELECT t FROM "tEvent" ORDER BY t')).scalars()
+            assert list(ts) == expected_ts
@@ -0,0 +1,131 @@
+import asyncio
+import os
+from unittest.mock import patch
+
+import orjson
+import pytest
+
+from midnite_api.middleware import ProfilingMiddleware
+from midnite_api.profiler import RequestProfile, write_profile
+
+
+class TestProfiler:
+    test_write_profile_scenarios = [
+        dict(
+            description="write_profile keeps every profile under the limit",
+            max_files=5,
+            n_profiles=3,
+            expected_request_ids=["0", "1", "2"],
+        ),
+        dict(
+            description="write_profile drops the oldest profiles over the limit",
+            max_files=2,
+            n_profiles=4,
+            expected_request_ids=["2", "3"],
+        ),
+    ]
+
+    def test_write_profile(
+        self, tmp_path, max_files: int, n_profiles: int, expected_request_ids
+    ) -> None:
+        with (
+            patch("midnite_api.profiler.PROFILING_DIR", str(tmp_path)),
+            patch("midnite_api.profiler.PROFILING_MAX_FILES", max_files),
+        ):
+            for i in range(n_profiles):
+                write_profile(
+                    RequestProfile(request_id=str(i), method="POST", path="/")
+                )
+
+        request_ids = [
+            orjson.loads((tmp_path / name).read_bytes())["request_id"]
+            for name in sorted(os.listdir(tmp_path))
+        ]
+
+        assert request_ids == expected_request_ids
+
+
+class TestProfilingMiddleware:
+    test_profiling_scenarios = [
+        dict(
+            description="header profiles the request when header profiling is enabled",
+            profiling_enabled=False,
+            header_enabled=True,
+            headers={"X-Profile": "1"},
+            expected_n_profiles=1,
+        ),
+        dict(
+            description="header is ignored when header profiling is disabled",
+            profiling_enabled=False,
+            header_enabled=False,
+            headers={"X-Profile": "1"},
+            expected_n_profiles=0,
+        ),
+        dict(
+            description="requests without header are profiled when enabled globally",
+            profiling_enabled=True,
+            header_enabled=False,
+            headers={},
+            expected_n_profiles=1,
+        ),
+    ]
+
+    def test_profiling(
+        self,
+        client,
+        tmp_path,
+        profiling_enabled: bool,
+        header_enabled: bool,
+        headers,
+        expected_n_profiles: int,
+    ) -> None:
+        profiles_dir = tmp_path / "profiles"
+        with (
+            patch("midnite_api.middleware.PROFILING_ENABLED", profiling_enabled),
+            patch("midnite_api.middleware.PROFILING_HEADER_ENABLED", header_enabled),
+            patch("midnite_api.middleware.PROFILING_THRESHOLD_MS", 0),
+            patch("midnite_api.profiler.PROFILING_DIR", str(profiles_dir)),
+        ):
+            response = client.post(
+                "/event",
+                json={"type": "deposit", "amount": 10.0, "user_id": 1, "t": 1},
+                headers=headers,
+            )
+
+        assert response.status_code == 201
+        profile_paths = list(profiles_dir.glob("*.json"))
+        assert len(profile_paths) == expected_n_profiles
+
+        for path in profile_paths:
+            profile = orjson.loads(path.read_bytes())
+            statements = [s["statement"] for s in profile["sql_statements"]]
+
+            assert profile["path"] == "/event"
+            assert any(s.startswith('INSERT INTO "tEvent"') for s in statements)
+            assert any(s.startswith('INSERT INTO "tUserState"') for s in statements)
+            assert all(s["duration_ms"] >= 0 for s in profile["sql_statements"])
+            assert "post_event" in profile["stats"]
+
+    test_failing_request_scenarios = [
+        dict(
+            description="profile of a request that raises is still written",
+            error=RuntimeError("boom"),
+        ),
+    ]
+
+    def test_failing_request(self, tmp_path, error: Exception) -> None:
+        async def failing_app(scope, receive, send):
+            raise error
+
+        scope = {"type": "http", "method": "POST", "path": "/event", "headers": []}
+        with (
+            patch("midnite_api.middleware.PROFILING_ENABLED", True),
+            patch("midnite_api.middleware.PROFILING_THRESHOLD_MS", 0),
+            patch("midnite_api.profiler.PROFILING_DIR", str(tmp_path)),
+        ):
+            with pytest.raises(type(error)):
+                asyncio.run(ProfilingMiddleware(failing_app)(scope, None, None))
+
+        profile_paths = list(tmp_path.glob("*.json"))
+        assert len(profile_paths) == 1
+        assert orjson.loads(profile_paths[0].read_bytes())["duration_ms"] >= 0
@@ -0,0 +1,39 @@
+from typing import List, Set
+
+import orjson
+
+from midnite_api.const import AlertCode
+from midnite_api.responses import ORJSONResponse
+from midnite_api.schemas import EventResponse
+
+
+class TestEventResponse:
+    test_from_alert_codes_scenarios = [
+        dict(
+            description="from_alert_codes returns alert codes as a sorted list",
+            alert_codes={AlertCode.CODE_1100, AlertCode.CODE_30, AlertCode.CODE_123},
+            expected_alert=True,
+            expected_alert_codes=[30, 123, 1100],
+        ),
+        dict(
+            description="from_alert_codes sets alert to False without alert codes",
+            alert_codes=set(),
+            expected_alert=False,
+            expected_alert_codes=[],
+        ),
+    ]
+
+    def test_from_alert_codes(
+        self,
+        alert_codes: Set[AlertCode],
+        expected_alert: bool,
+        expected_alert_codes: List[int],
+    ) -> None:
+        response = EventResponse.from_alert_codes(alert_codes, user_id=1)
+        body = orjson.loads(ORJSONResponse(content=response.model_dump()).body)
+
+        assert body == {
+            "alert": expected_alert,
+            "alert_codes": expected_alert_codes,
+            "user_id": 1,
+        }
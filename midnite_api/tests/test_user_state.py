@@ -0,0 +1,187 @@
+from typing import Dict, List, Optional
+
+import pytest
+from sqlalchemy.orm import Session
+
+from midnite_api.const import EventType
+from midnite_api.event import insert_event
+from midnite_api.models import Event, UserState
+from midnite_api.schemas import EventSchema
+from midnite_api.user_state import (
+    OutOfOrderEventError,
+    apply_event,
+    rebuild_user_states,
+)
+
+
+class TestUserState:
+    test_apply_event_scenarios = [
+        dict(
+            description="apply_event creates the state on the user's first event",
+            state=None,
+            event=EventSchema(user_id=1, amount=50.0, t=1, type=EventType.DEPOSIT),
+            expected_event_types=["deposit"],
+            expected_deposit_amounts=[50.0],
+            expected_deposit_window=[[1, 50.0]],
+        ),
+        dict(
+            description="apply_event keeps only the last 3 event types",
+            state=UserState(
+                user_id=1,
+                latest_t=3,
+                last_event_types=["withdraw", "deposit", "withdraw"],
+                last_deposit_amounts=[20.0],
+                deposit_window=[[2, 20.0]],
+            ),
+            event=EventSchema(user_id=1, amount=10.0, t=4, type=EventType.WITHDRAW),
+            expected_event_types=["withdraw", "withdraw", "deposit"],
+            expected_deposit_amounts=[20.0],
+            expected_deposit_window=[[2, 20.0]],
+        ),
+        dict(
+            description="apply_event drops deposits older than 30s from the window",
+            state=UserState(
+                user_id=1,
+                latest_t=20,
+                last_event_types=["deposit", "deposit", "deposit"],
+                last_deposit_amounts=[30.0, 20.0, 10.0],
+                deposit_window=[[1, 10.0], [10, 20.0], [20, 30.0]],
+            ),
+            event=EventSchema(user_id=1, amount=40.0, t=40, type=EventType.DEPOSIT),
+            expected_event_types=["deposit", "deposit", "deposit"],
+            expected_deposit_amounts=[40.0, 30.0, 20.0],
+            expected_deposit_window=[[10, 20.0], [20, 30.0], [40, 40.0]],
+        ),
+    ]
+
+    def test_apply_event(
+        self,
+        state: Optional[UserState],
+        event: EventSchema,
+        expected_event_types: List[str],
+        expected_deposit_amounts: List[float],
+        expected_deposit_window: List[List],
+    ) -> None:
+        new_state = apply_event(state, event)
+
+        assert new_state.latest_t == event.t
+        assert new_state.last_event_types == expected_event_types
+        assert new_state.last_deposit_amounts == expected_deposit_amounts
+        assert new_state.deposit_window == expected_deposit_window
+
+
+def _user_states(db: Session) -> Dict[int, tuple]:
+    return {
+        state.user_id: (
+            state.latest_t,
+            state.last_event_types,
+            state.last_deposit_amounts,
+            state.deposit_window,
+        )
+        for state in db.query(UserState)
+    }
+
+
+class TestUserStateDB:
+    test_insert_event_scenarios = [
+        dict(
+            description="insert_event commits each event along with its user state",
+            events=[
+                EventSchema(user_id=1, amount=10.0, t=1, type=EventType.DEPOSIT),
+                EventSchema(user_id=2, amount=5.0, t=2, type=EventType.WITHDRAW),
+                EventSchema(user_id=1, amount=20.0, t=3, type=EventType.DEPOSIT),
+                EventSchema(user_id=1, amount=7.0, t=4, type=EventType.WITHDRAW),
+            ],
+            expected_error=None,
+            expected_ts=[1, 2, 3, 4],
+            expected_states={
+                1: (
+                    4,
+                    ["withdraw", "deposit", "deposit"],
+                    [20.0, 10.0],
+                    [[1, 10.0], [3, 20.0]],
+                ),
+                2: (2, ["withdraw"], [], []),
+            },
+        ),
+        dict(
+            description="insert_event rolls back an event older than the user's latest",
+            events=[
+                EventSchema(user_id=1, amount=10.0, t=11, type=EventType.DEPOSIT),
+                EventSchema(user_id=1, amount=20.0, t=10, type=EventType.DEPOSIT),
+            ],
+            expected_error=OutOfOrderEventError,
+            expected_ts=[11],
+            expected_states={1: (11, ["deposit"], [10.0], [[11, 10.0]])},
+        ),
+    ]
+
+    def test_insert_event(
+        self,
+        db: Session,
+        session_factory,
+        events: List[EventSchema],
+        expected_error,
+        expected_ts: List[int],
+        expected_states: Dict[int, tuple],
+    ) -> None:
+        for event in events[:-1]:
+            insert_event(db, event)
+
+        if expected_error:
+            with pytest.raises(expected_error):
+                insert_event(db, events[-1])
+        else:
+            insert_event(db, events[-1])
+
+        with session_factory() as check_db:
+            ts = [event.t for event in check_db.query(Event).order_by(Event.t)]
+
+            assert ts == expected_ts
+            assert _user_states(check_db) == expected_states
+
+    test_rebuild_user_states_scenarios = [
+        dict(
+            description="rebuild_user_states folds all stored events in order of t",
+            events=[
+                Event(user_id=1, amount=10.0, t=1, type=EventType.DEPOSIT),
+                Event(user_id=1, amount=20.0, t=2, type=EventType.DEPOSIT),
+                Event(user_id=2, amount=5.0, t=3, type=EventType.WITHDRAW),
+                Event(user_id=1, amount=30.0, t=40, type=EventType.DEPOSIT),
+            ],
+            stale_states=[
+                UserState(
+                    user_id=1,
+                    latest_t=40,
+                    last_event_types=["deposit"],
+                    last_deposit_amounts=[30.0],
+                    deposit_window=[[40, 30.0]],
+                ),
+            ],
+            expected_states={
+                1: (
+                    40,
+                    ["deposit", "deposit", "deposit"],
+                    [30.0, 20.0, 10.0],
+                    [[40, 30.0]],
+                ),
+                2: (3, ["withdraw"], [], []),
+            },
+        ),
+    ]
+
+    def test_rebuild_user_states(
+        self,
+        db: Session,
+        session_factory,
+        events: List[Event],
+        stale_states: List[UserState],
+        expected_states: Dict[int, tuple],
+    ) -> None:
+        db.add_all(events + stale_states)
+        db.commit()
+
+        rebuild_user_states(db)
+
+        with session_factory() as check_db:
+            assert _user_states(check_db) == expected_states